@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 import sys
+import time
 from pathlib import Path
 from datetime import datetime, timezone
 
@@ -128,12 +129,12 @@ def get_system_status() -> SystemStatus:
     try:
         from datetime import datetime, timezone
         
-        phase_stats = controller.analyzer.get_phase_stats()
-        r_mode = controller.analyzer.detect_mode(phase_stats)
-        mode = controller._stable_mode(r_mode)
-        imbalance = controller.analyzer.get_imbalance(phase_stats)
-        phase_issues = controller.analyzer.detect_voltage_issues(phase_stats)
-        power_issues = controller.analyzer.detect_power_issues(phase_stats)
+        snapshot = controller.analyzer.snapshot()
+        phase_stats = snapshot.phase_stats
+        mode = controller._stable_mode(snapshot.detected_mode, time.monotonic())
+        imbalance = snapshot.imbalance_kw
+        phase_issues = snapshot.voltage_issues
+        power_issues = snapshot.power_issues
         
         # Build per-phase analytics with houses
         phases_data = []
@@ -271,7 +272,7 @@ def get_phase_details(phase: str) -> PhaseAnalytics:
     Returns: phase power, voltage, house count, and all houses on that phase.
     """
     try:
-        phase_stats = controller.analyzer.get_phase_stats()
+        phase_stats = controller.analyzer.snapshot().phase_stats
         phase_data = next((ps for ps in phase_stats if ps.phase == phase), None)
         
         if not phase_data:
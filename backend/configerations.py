@@ -1,3 +1,4 @@
+import sys
 from pathlib import Path
 
 # Timing / gating
@@ -8,6 +9,13 @@ READING_EXPIRY_SECONDS = 3600
 MIN_IMBALANCE_KW = 0.15  # Lowered to 150W for small loads like 170W bulbs
 # Phases
 PHASES = ["L1", "L2", "L3"]
+N_PHASES = 3
+PHASE_IDX = {p: i for i, p in enumerate(PHASES)}  # Phase name -> index into per-phase float vectors
+OTHER_PHASES_IDX = ((1, 2), (0, 2), (0, 1))  # Phase index -> the two other phase indices, in PHASES order
+
+# System modes; interned so every mode string in the process is the same object
+MODE_EXPORT = sys.intern("EXPORT")
+MODE_CONSUME = sys.intern("CONSUME")
 
 # Switch / balancing tuning
 SWITCH_IMPROVEMENT_KW = 0.05  # Lowered to 50W to allow smaller improvements
@@ -46,4 +54,8 @@ HISTORY_DB = DATA_DIR / "switch_history.json"
 
 # Phase telemetry settings
 PHASE_TELEMETRY_EXPIRY_SECONDS = 10  # Phase totals expire after 10 seconds (fall back to house summation)
-USE_PHASE_NODE_PRIORITY = False      # If True, prefer phase node telemetry over house summation (DISABLED - using house summation only)
\ No newline at end of file
+USE_PHASE_NODE_PRIORITY = False      # If True, prefer phase node telemetry over house summation (DISABLED - using house summation only)
+
+# Switch simulation
+VECTORIZE_MIN_CANDIDATES = 20        # Use the NumPy/Numba kernel once this many candidates are evaluated (scalar loop is faster below)
+USE_NUMBA_JIT = True                 # If True and numba is installed, JIT-compile the switch simulation loop
@@ -1,138 +1,136 @@
 '''
 Consume-mode logic -> handles phase balancing when system is consuming.
 '''
-from datetime import datetime, timezone
-from typing import Optional, Dict, List
+import logging
+from operator import attrgetter
+from typing import Optional, List
 from utility import (
     RecommendedSwitch, 
     HouseRegistry,
-    PhaseRegistry
+    HouseSnapshot,
+    PhaseRegistry,
+    PhaseSnapshot,
 )
+from simulation import best_move
 from configerations import (
     CRITICAL_IMBALANCE_KW,
     HIGH_IMBALANCE_KW,
     HIGH_IMPORT_THRESHOLD,
     MIN_IMBALANCE_KW,
+    PHASE_IDX,
     PHASES,
     SWITCH_IMPROVEMENT_KW,
-    READING_EXPIRY_SECONDS,
 )
+
+logger = logging.getLogger(__name__)
+
+
 class consumption_logic:
     def __init__(self, registry: HouseRegistry, analyzer: PhaseRegistry):
         self.registry = registry
         self.analyzer = analyzer
     
-    def find_best_switch(self) -> Optional[RecommendedSwitch]:
+    def find_best_switch(
+        self,
+        skip_small_threshold: float = CRITICAL_IMBALANCE_KW,
+        snapshot: Optional[PhaseSnapshot] = None,
+    ) -> Optional[RecommendedSwitch]:
         """Find the best house to switch to reduce consumption imbalance.
         
         Strategy: candidates are heavy consumers; simulate moving each to other phases;
         pick the move that maximizes net imbalance reduction.
+
+        Houses under 100W are only considered once the imbalance reaches
+        skip_small_threshold (pass HIGH_IMBALANCE_KW for a more lenient mode).
+        `snapshot` is the cycle's PhaseSnapshot; fetched from the analyzer if omitted.
         """
-        now = datetime.now(timezone.utc)
-        phase_stats = self.analyzer.get_phase_stats()
-        current_imbalance_kw = self.analyzer.get_imbalance(phase_stats)
+        if snapshot is None:
+            snapshot = self.analyzer.snapshot()
+        current_imbalance_kw = snapshot.imbalance_kw
 
-        print(f"  [CONSUME] Current imbalance: {current_imbalance_kw:.2f} kW")
+        logger.debug("[CONSUME] Current imbalance: %.2f kW", current_imbalance_kw)
         
         if current_imbalance_kw < MIN_IMBALANCE_KW:
-            print(f"  [CONSUME] Imbalance too low ({current_imbalance_kw:.2f} < {MIN_IMBALANCE_KW})")
+            logger.debug("[CONSUME] Imbalance too low (%.2f < %s)", current_imbalance_kw, MIN_IMBALANCE_KW)
             return None
 
-        house_powers: List[Dict] = []
-        for house in self.registry.houses.values():
-            r = house.last_reading
-            if not r:
-                continue
-            if (now - r.timestamp).total_seconds() > READING_EXPIRY_SECONDS:
-                continue
+        house_powers = self.registry.snapshot()
 
-            house_powers.append({
-                "house_id": house.house_id,
-                "phase": house.phase,
-                "power_kw": r.power_kw,
-            })
-
-        print(f"  [CONSUME] Found {len(house_powers)} houses with valid readings")
+        logger.debug("[CONSUME] Found %d houses with valid readings", len(house_powers))
         
-        candidates = [hp for hp in house_powers if hp["power_kw"] > 0.05]
-        candidates.sort(key=lambda x: abs(x["power_kw"]), reverse=True)
-
-        print(f"  [CONSUME] Found {len(candidates)} candidate houses for switching")
-        for c in candidates[:5]:  # Show top 5
-            print(f"    - {c['house_id']}: {c['power_kw']:.2f} kW on {c['phase']}")
+        candidates = [hp for hp in house_powers if hp.power_kw > 0.05]
+        # Every candidate is a positive load, so no abs() is needed in the key
+        candidates.sort(key=attrgetter("power_kw"), reverse=True)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[CONSUME] Found %d candidate houses for switching", len(candidates))
+            for c in candidates[:5]:  # Show top 5
+                logger.debug("  - %s: %.2f kW on %s", c.house_id, c.power_kw, c.phase)
         
         if not candidates:
-            print(f"  [CONSUME] No candidates found")
+            logger.debug("[CONSUME] No candidates found")
             return None
 
-        baseline_net = {p: 0.0 for p in PHASES}
-        for hp in house_powers:
-            baseline_net[hp["phase"]] += hp["power_kw"]
+        baseline_net = snapshot.phase_power
 
-        print(f"  [CONSUME] Baseline phase loads: L1={baseline_net['L1']:.2f}, L2={baseline_net['L2']:.2f}, L3={baseline_net['L3']:.2f}")
+        logger.debug("[CONSUME] Baseline phase loads: L1=%.2f, L2=%.2f, L3=%.2f", *baseline_net)
         
         if current_imbalance_kw >= CRITICAL_IMBALANCE_KW:
             hysteresis_threshold = 0.05
         else:
             hysteresis_threshold = max(SWITCH_IMPROVEMENT_KW, 0.02 * current_imbalance_kw)
-        print(f"  [CONSUME] Hysteresis threshold: {hysteresis_threshold:.3f} kW")
+        logger.debug("[CONSUME] Hysteresis threshold: %.3f kW", hysteresis_threshold)
 
-        best: Optional[RecommendedSwitch] = None
-        best_improvement = 0.0
-
-        # Try each candidate move to each target phase
+        # Drop houses too small to be worth moving, then simulate every
+        # remaining candidate against both other phases in one kernel call
+        movable: List[HouseSnapshot] = []
         for candidate in candidates:
-            house_id = candidate["house_id"]
-            source_phase = candidate["phase"]
-            power_kw = candidate["power_kw"]
+            house_id = candidate.house_id
+            power_kw = candidate.power_kw
 
             # Lowered threshold to allow small houses (100W+) to be switched
             is_small_house = power_kw < 0.1  # 100W threshold instead of 400W
             skip_small_house = (
                 is_small_house and 
-                current_imbalance_kw < CRITICAL_IMBALANCE_KW  # Only skip tiny houses if NOT critical
+                current_imbalance_kw < skip_small_threshold  # Only skip tiny houses below the threshold
             )
             if skip_small_house:
-                print(f"    [CONSUME] Skipping {house_id} ({power_kw:.2f}kW - too small for non-critical imbalance)")
+                logger.debug("[CONSUME] Skipping %s (%.2fkW - too small for non-critical imbalance)", house_id, power_kw)
                 continue
 
-            print(f"    [CONSUME] Evaluating {house_id} ({power_kw:.2f}kW from {source_phase})")
-            
-            for target_phase in PHASES:
-                if target_phase == source_phase:
-                    continue
-
-                new_net = baseline_net.copy()
-                new_net[source_phase] -= power_kw
-                new_net[target_phase] += power_kw
-
-                new_imbalance = max(new_net.values()) - min(new_net.values())
-                improvement = current_imbalance_kw - new_imbalance
-
-                print(f"      {source_phase}→{target_phase}: new_loads=[L1:{new_net['L1']:.2f}, L2:{new_net['L2']:.2f}, L3:{new_net['L3']:.2f}], new_imbalance={new_imbalance:.2f}, improvement={improvement:.3f}")
-                
-                if improvement <= 0:
-                    print(f"        SKIP: No improvement")
-                    continue
-                if improvement < hysteresis_threshold:
-                    print(f"        SKIP: Below threshold ({improvement:.3f} < {hysteresis_threshold:.3f})")
-                    continue
-
-                if improvement > best_improvement:
-                    best_improvement = improvement
-                    best = RecommendedSwitch(
-                        house_id=house_id,
-                        from_phase=source_phase,
-                        to_phase=target_phase,
-                        improved_kw=improvement,
-                        new_imbalance_kw=new_imbalance,
-                        reason=f"Consume: move {power_kw:.2f}kW from {source_phase} to {target_phase} (Δ={improvement:.2f}kW)",
-                    )
-                    print(f"        ✓ NEW BEST: improvement={improvement:.3f} kW")
+            movable.append(candidate)
+
+        logger.debug("[CONSUME] Simulating %d candidate houses", len(movable))
+
+        best: Optional[RecommendedSwitch] = None
+        move = best_move(
+            baseline_net,
+            [c.power_kw for c in movable],
+            [PHASE_IDX[c.phase] for c in movable],
+            current_imbalance_kw,
+            hysteresis_threshold,
+        )
+        if move:
+            i, dst, improvement, new_imbalance = move
+            candidate = movable[i]
+            source_phase = candidate.phase
+            target_phase = PHASES[dst]
+            power_kw = candidate.power_kw
+            best = RecommendedSwitch(
+                house_id=candidate.house_id,
+                from_phase=source_phase,
+                to_phase=target_phase,
+                improved_kw=improvement,
+                new_imbalance_kw=new_imbalance,
+                reason=f"Consume: move {power_kw:.2f}kW from {source_phase} to {target_phase} (Δ={improvement:.2f}kW)",
+            )
 
         if best:
-            print(f"  [CONSUME] Returning recommendation: {best.house_id} {best.from_phase}→{best.to_phase}")
+            logger.debug(
+                "[CONSUME] Returning recommendation: %s %s→%s (improvement=%.3f kW)",
+                best.house_id, best.from_phase, best.to_phase, best.improved_kw,
+            )
         else:
-            print(f"  [CONSUME] No valid recommendation found")
+            logger.debug("[CONSUME] No valid recommendation found")
         
         return best
@@ -1,14 +1,18 @@
+import logging
+import time
 from datetime import datetime, timezone
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
-from configerations import CRITICAL_IMBALANCE_KW, HIGH_EXPORT_THRESHOLD, HIGH_IMPORT_THRESHOLD, HIGH_IMBALANCE_KW, MIN_IMBALANCE_KW, MIN_SWITCH_GAP_MIN
-from utility import HouseRegistry, PhaseRegistry, DataStorage
+from configerations import CRITICAL_IMBALANCE_KW, HIGH_EXPORT_THRESHOLD, HIGH_IMPORT_THRESHOLD, HIGH_IMBALANCE_KW, MIN_IMBALANCE_KW, MIN_SWITCH_GAP_MIN, MODE_EXPORT, SWITCH_IMPROVEMENT_KW
+from utility import HouseRegistry, HouseState, PhaseRegistry, PhaseStats, RecommendedSwitch, DataStorage
 from export import export_logic
 from consumption import consumption_logic
 
+logger = logging.getLogger(__name__)
+
+# A house this large (either direction) is always worth moving; folded once at import
+_STRONG_THRESHOLD = max(HIGH_EXPORT_THRESHOLD, HIGH_IMPORT_THRESHOLD)
 
-def minutes_since(ts: datetime) -> float:
-    return (datetime.now(timezone.utc) - ts).total_seconds() / 60.0
 
 class PhaseBalancingController:
     """Main controller orchestrating all logic"""
@@ -21,36 +25,112 @@ class PhaseBalancingController:
         self.night_balancer = consumption_logic(self.registry, self.analyzer)
 
         self._last_mode: Optional[str] = None
-        self._mode_since: Optional[datetime] = None
+        # Monotonic seconds (time.monotonic()); immune to wall-clock jumps
+        self._mode_since: Optional[float] = None
         self._pending_mode: Optional[str] = None
-        self._pending_since: Optional[datetime] = None
+        self._pending_since: Optional[float] = None
         self.MODE_STABLE_SECONDS = 10
 
-    def _stable_mode(self, detected_mode: str) -> str:
-        now = datetime.now(timezone.utc)
+    def _stable_mode(self, detected_mode: str, now_mono: float) -> str:
         if self._last_mode is None:
             self._last_mode = detected_mode
-            self._mode_since = now
+            self._mode_since = now_mono
             self._pending_mode = detected_mode
-            self._pending_since = now
+            self._pending_since = now_mono
             return detected_mode
 
         if detected_mode == self._last_mode:
             self._pending_mode = detected_mode
-            self._pending_since = now
-            self._mode_since = self._mode_since or now
+            self._pending_since = now_mono
+            if self._mode_since is None:
+                self._mode_since = now_mono
             return self._last_mode
 
         if self._pending_mode != detected_mode:
             self._pending_mode = detected_mode
-            self._pending_since = now
+            self._pending_since = now_mono
             return self._last_mode
 
-        if self._pending_since and (now - self._pending_since).total_seconds() >= self.MODE_STABLE_SECONDS:
+        if self._pending_since is not None and now_mono - self._pending_since >= self.MODE_STABLE_SECONDS:
             self._last_mode = detected_mode
-            self._mode_since = now
+            self._mode_since = now_mono
         return self._last_mode
         
+    def _build_status(
+        self,
+        timestamp: str,
+        mode: str,
+        imbalance: float,
+        phase_stats: List[PhaseStats],
+        phase_issues: Dict,
+        power_issues: Dict,
+        precision: int,
+    ) -> Dict:
+        """Status report shared by the healthy early exit and the full cycle."""
+        return {
+            "timestamp": timestamp,
+            "mode": mode,
+            "imbalance_kw": round(imbalance, precision),
+            "phase_stats": [
+                {
+                    "phase": ps.phase,
+                    "power_kw": round(ps.total_power_kw, precision),
+                    "voltage": round(ps.avg_voltage, 1) if ps.avg_voltage else None,
+                    "house_count": ps.house_count
+                }
+                for ps in phase_stats
+            ],
+            "phase_issues": phase_issues,
+            "power_issues": power_issues,
+            "recommendation": None,
+        }
+
+    def _cooldown_ok(self, recommendation: RecommendedSwitch, house: HouseState, now_epoch: float) -> bool:
+        """Reject houses switched less than MIN_SWITCH_GAP_MIN minutes ago."""
+        mins_since_switch = (now_epoch - house.last_changed_epoch) / 60.0
+        if mins_since_switch < MIN_SWITCH_GAP_MIN:
+            logger.debug(
+                "REJECTED: House %s switched %.2f min ago (cooldown: %s min)",
+                recommendation.house_id, mins_since_switch, MIN_SWITCH_GAP_MIN,
+            )
+            return False
+        return True
+
+    def _improvement_ok(self, recommendation: RecommendedSwitch, house: HouseState, imbalance: float) -> bool:
+        """Conflict-resolution moves always pass; others need a positive, worthwhile gain."""
+        if recommendation.is_conflict_resolution:
+            logger.debug("APPROVED: Conflict resolution move (bypasses normal checks)")
+            return True
+
+        if recommendation.improved_kw <= 0:
+            logger.debug("REJECTED: Non-positive improvement (%.2f kW)", recommendation.improved_kw)
+            return False
+
+        # One slot load for the reading, one for its power, one abs()
+        last_read = house.last_reading
+        abs_power = abs(last_read.power_kw) if last_read is not None else 0.0
+
+        # Aligned with idk.py working thresholds
+        strong_house = abs_power >= _STRONG_THRESHOLD  # 100W threshold for small loads
+        high_imbalance = imbalance >= HIGH_IMBALANCE_KW  # 150W imbalance threshold
+        good_improvement = recommendation.improved_kw >= SWITCH_IMPROVEMENT_KW  # 50W improvement threshold
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Validation: power=%.2fkW, imbalance=%.2fkW, improvement=%.2fkW",
+                abs_power, imbalance, recommendation.improved_kw,
+            )
+            logger.debug(
+                "  strong_house=%s, high_imbalance=%s, good_improvement=%s",
+                strong_house, high_imbalance, good_improvement,
+            )
+
+        if not (strong_house or high_imbalance or good_improvement):
+            logger.debug("REJECTED: House too small and improvement insufficient")
+            return False
+        logger.debug("APPROVED: Validation passed")
+        return True
+
     def run_cycle(self) -> Dict:
         """
         Run one balancing cycle - implements single-switch-per-run logic.
@@ -59,12 +139,17 @@ class PhaseBalancingController:
         IMPORTANT: Only ONE switch will be applied per cycle, even if multiple
         improvements are available. This enforces gradual, predictable changes.
         """
-        phase_stats = self.analyzer.get_phase_stats()
-        r_mode = self.analyzer.detect_mode(phase_stats)
-        mode = self._stable_mode(r_mode)
-        imbalance = self.analyzer.get_imbalance(phase_stats)
-        phase_issues = self.analyzer.detect_voltage_issues(phase_stats)
-        power_issues = self.analyzer.detect_power_issues(phase_stats)
+        # One wall-clock read per cycle, shared by the switch cooldown check
+        # and the status timestamp, plus one monotonic read for mode stabilisation
+        now = datetime.now(timezone.utc)
+        now_mono = time.monotonic()
+        timestamp = now.isoformat()
+        snapshot = self.analyzer.snapshot()
+        phase_stats = snapshot.phase_stats
+        mode = self._stable_mode(snapshot.detected_mode, now_mono)
+        imbalance = snapshot.imbalance_kw
+        phase_issues = snapshot.voltage_issues
+        power_issues = snapshot.power_issues
         
         # Check and send alerts if needed
         try:
@@ -81,110 +166,46 @@ class PhaseBalancingController:
                 power_issues=power_issues
             )
         except Exception as e:
-            print(f"[ALERT] Warning: Failed to check alerts: {e}")
+            logger.warning("[ALERT] Failed to check alerts: %s", e)
         
-        print(f"\n=== PHASE BALANCING CYCLE ===")
-        print(f"Mode: {mode}, Imbalance: {imbalance:.2f} kW")
-        for ps in phase_stats:
-            print(f"  {ps.phase}: {ps.total_power_kw:.2f} kW ({ps.house_count} houses)")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("=== PHASE BALANCING CYCLE ===")
+            logger.debug("Mode: %s, Imbalance: %.2f kW", mode, imbalance)
+            for ps in phase_stats:
+                logger.debug("  %s: %.2f kW (%d houses)", ps.phase, ps.total_power_kw, ps.house_count)
         
-        if (not phase_issues) and (not power_issues) and (imbalance < MIN_IMBALANCE_KW):
-            print(f"System healthy - no action needed (imbalance {imbalance:.2f} < {MIN_IMBALANCE_KW})")
-            return {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "mode": mode,
-                "imbalance_kw": round(imbalance, 3),
-                "phase_stats": [
-                    {"phase": ps.phase, "power_kw": round(ps.total_power_kw, 3), "voltage": round(ps.avg_voltage, 1) if ps.avg_voltage else None, "house_count": ps.house_count}
-                    for ps in phase_stats
-                ],
-                "phase_issues": phase_issues,
-                "power_issues": power_issues,
-                "recommendation": None,
-            }
-        
-        recommendation = None
+        # Cheapest test first: balanced systems are the only ones that can exit here
+        if imbalance < MIN_IMBALANCE_KW and not phase_issues and not power_issues:
+            logger.debug("System healthy - no action needed (imbalance %.2f < %s)", imbalance, MIN_IMBALANCE_KW)
+            return self._build_status(timestamp, mode, imbalance, phase_stats, phase_issues, power_issues, precision=3)
         
-        if mode == "EXPORT":
-            print("Using EXPORT mode balancer")
-            recommendation = self.morning_balancer.find_best_switch()
+        if mode == MODE_EXPORT:
+            logger.debug("Using EXPORT mode balancer")
+            recommendation = self.morning_balancer.find_best_switch(snapshot=snapshot)
         else:
-            print("Using CONSUME mode balancer")
-            recommendation = self.night_balancer.find_best_switch()
+            logger.debug("Using CONSUME mode balancer")
+            recommendation = self.night_balancer.find_best_switch(snapshot=snapshot)
         
-        if recommendation:
-            print(f"Balancer recommends: {recommendation.house_id} from {recommendation.from_phase} to {recommendation.to_phase} (improvement: {recommendation.improved_kw:.2f} kW)")
+        if recommendation is None:
+            logger.debug("Balancer returned no recommendation")
         else:
-            print("Balancer returned no recommendation")
-        
-        if recommendation:
+            logger.debug(
+                "Balancer recommends: %s from %s to %s (improvement: %.2f kW)",
+                recommendation.house_id, recommendation.from_phase, recommendation.to_phase, recommendation.improved_kw,
+            )
             house = self.registry.houses.get(recommendation.house_id)
+            # Each check logs its own rejection; the first failure short-circuits the rest
             if house is None:
-                print(f"REJECTED: House {recommendation.house_id} not found in registry")
+                logger.debug("REJECTED: House %s not found in registry", recommendation.house_id)
+                recommendation = None
+            elif not (
+                self._cooldown_ok(recommendation, house, now.timestamp())
+                and self._improvement_ok(recommendation, house, imbalance)
+            ):
                 recommendation = None
-            else:
-                try:
-                    mins_since_switch = minutes_since(house.last_changed)
-                    if mins_since_switch < MIN_SWITCH_GAP_MIN:
-                        print(f"REJECTED: House {recommendation.house_id} switched {mins_since_switch:.2f} min ago (cooldown: {MIN_SWITCH_GAP_MIN} min)")
-                        recommendation = None
-                except (AttributeError, TypeError):
-                    print(f"House {recommendation.house_id} has no switch history - allowing")
-                    pass
-                
-                if recommendation:
-                    is_conflict_resolution = "CONFLICT" in recommendation.reason.upper()
-                    
-                    if not is_conflict_resolution:
-                        if recommendation.improved_kw <= 0:
-                            print(f"REJECTED: Non-positive improvement ({recommendation.improved_kw:.2f} kW)")
-                            recommendation = None
-                        elif recommendation.improved_kw > 0:
-                            try:
-                                last_read = house.last_reading
-                                p = last_read.power_kw if last_read else 0.0
-                                
-                                # Aligned with idk.py working thresholds
-                                strong_house = abs(p) >= 0.1  # 100W threshold for small loads
-                                high_imbalance = imbalance >= 0.15  # 150W imbalance threshold
-                                good_improvement = recommendation.improved_kw >= 0.05  # 50W improvement threshold
-                                
-                                print(f"Validation: power={abs(p):.2f}kW, imbalance={imbalance:.2f}kW, improvement={recommendation.improved_kw:.2f}kW")
-                                print(f"  strong_house={strong_house}, high_imbalance={high_imbalance}, good_improvement={good_improvement}")
-                                
-                                if not (strong_house or high_imbalance or good_improvement):
-                                    print(f"REJECTED: House too small and improvement insufficient")
-                                    recommendation = None
-                                else:
-                                    print(f"APPROVED: Validation passed")
-                            except Exception as e:
-                                # Fallback: require only 50W improvement if reading missing
-                                if recommendation.improved_kw < 0.05:
-                                    print(f"REJECTED: Missing reading and improvement < 0.05 kW")
-                                    recommendation = None
-                                else:
-                                    print(f"APPROVED: Good improvement despite missing reading")
-                    else:
-                        print(f"APPROVED: Conflict resolution move (bypasses normal checks)")
         
         # Build status report
-        status = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "mode": mode,
-            "imbalance_kw": round(imbalance, 2),
-            "phase_stats": [
-                {
-                    "phase": ps.phase,
-                    "power_kw": round(ps.total_power_kw, 2),
-                    "voltage": round(ps.avg_voltage, 1) if ps.avg_voltage else None,
-                    "house_count": ps.house_count
-                }
-                for ps in phase_stats
-            ],
-            "phase_issues": phase_issues,
-            "power_issues": power_issues,
-            "recommendation": None
-        }
+        status = self._build_status(timestamp, mode, imbalance, phase_stats, phase_issues, power_issues, precision=2)
         
         if recommendation:
             status["recommendation"] = {
@@ -0,0 +1,215 @@
+"""Switch simulation kernels shared by the consume and export balancers.
+
+Phase totals are passed as a three-element vector ordered like `PHASES`.
+A move takes `power_kw` off the source phase and puts it on the target
+phase; only those two totals change, so each simulation is a handful of
+float operations.
+
+`best_move` returns the single move with the largest improvement, or
+None when nothing clears `threshold_kw`. Ties go to the earliest
+candidate, then the earliest target phase, matching the original
+candidate-by-candidate loop.
+
+Small fleets use a plain Python loop. Larger ones use the Numba-compiled
+version of that loop when numba is installed, else NumPy broadcasting.
+"""
+
+import logging
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from configerations import OTHER_PHASES_IDX, USE_NUMBA_JIT, VECTORIZE_MIN_CANDIDATES
+
+logger = logging.getLogger(__name__)
+
+# (candidate_index, target_phase_index, improvement_kw, new_imbalance_kw)
+Move = Tuple[int, int, float, float]
+
+
+def imbalance3(a: float, b: float, c: float) -> float:
+    """max(a, b, c) - min(a, b, c) with four compares and no iterator setup."""
+    hi = a if a > b else b
+    if c > hi:
+        hi = c
+    lo = a if a < b else b
+    if c < lo:
+        lo = c
+    return hi - lo
+
+
+def _best_move_loop(
+    base: Sequence[float],
+    powers: Sequence[float],
+    src_idx: Sequence[int],
+    current_imbalance_kw: float,
+    threshold_kw: float,
+) -> Move:
+    """Candidate x target scan; returns (-1, -1, 0.0, 0.0) when nothing qualifies.
+
+    Sticks to the subset of Python that Numba compiles so the same source
+    backs both the pure-Python path and the JIT kernel.
+
+    Moves that cannot improve are pruned before simulating. Moving a load
+    (power > 0) only helps if it leaves the highest phase or lands on the
+    lowest one. Moving an exporter (power < 0) only helps if it leaves
+    the lowest phase or lands on the highest. Otherwise the old maximum
+    and minimum both survive the move. Candidates whose 2|power| bound is
+    below the threshold or the best improvement so far are skipped
+    outright, which cuts most of the scan when callers pass candidates
+    largest first.
+    """
+    base_hi = base[0] if base[0] > base[1] else base[1]
+    base_hi = base_hi if base_hi > base[2] else base[2]
+    base_lo = base[0] if base[0] < base[1] else base[1]
+    base_lo = base_lo if base_lo < base[2] else base[2]
+
+    # Local alias: LOAD_FAST instead of a module-dict lookup per candidate
+    other_phases_idx = OTHER_PHASES_IDX
+
+    best_i = -1
+    best_dst = -1
+    best_improvement = 0.0
+    best_new_imbalance = 0.0
+    for i in range(len(powers)):
+        power = powers[i]
+        # Every phase total moves by at most |power|, so the spread can shrink
+        # by at most 2|power|; skip candidates that cannot clear the bar
+        bound = 2.0 * abs(power)
+        if bound < threshold_kw or bound < best_improvement:
+            continue
+        src = src_idx[i]
+        if power > 0.0:
+            any_target = base[src] == base_hi
+            needed_target = base_lo
+        elif power < 0.0:
+            any_target = base[src] == base_lo
+            needed_target = base_hi
+        else:
+            continue
+        new_src = base[src] - power
+        for dst in other_phases_idx[src]:
+            if not any_target and base[dst] != needed_target:
+                continue
+            new_dst = base[dst] + power
+            other = base[3 - src - dst]
+
+            hi = new_src if new_src > new_dst else new_dst
+            hi = hi if hi > other else other
+            lo = new_src if new_src < new_dst else new_dst
+            lo = lo if lo < other else other
+            new_imbalance = hi - lo
+            improvement = current_imbalance_kw - new_imbalance
+
+            if improvement <= 0 or improvement < threshold_kw:
+                continue
+            if improvement > best_improvement:
+                best_i = i
+                best_dst = dst
+                best_improvement = improvement
+                best_new_imbalance = new_imbalance
+    return best_i, best_dst, best_improvement, best_new_imbalance
+
+
+def _best_move_scalar(
+    base: Sequence[float],
+    powers: Sequence[float],
+    src_idx: Sequence[int],
+    current_imbalance_kw: float,
+    threshold_kw: float,
+) -> Optional[Move]:
+    move = _best_move_loop(base, powers, src_idx, current_imbalance_kw, threshold_kw)
+    return move if move[0] >= 0 else None
+
+
+# Optional Numba JIT of the same loop for float64/int64 inputs. Built by
+# _jit_kernel() on the first fleet large enough to use it, so importing the
+# balancers never pays for numba; cached on disk for later processes.
+_best_move_jit = None
+_jit_attempted = False
+
+
+def _jit_kernel():
+    """The compiled kernel, or None when numba is off, missing or failed."""
+    global _best_move_jit, _jit_attempted
+    if not _jit_attempted:
+        _jit_attempted = True
+        if USE_NUMBA_JIT:
+            try:
+                from numba import njit
+                _best_move_jit = njit(
+                    "Tuple((i8, i8, f8, f8))(f8[:], f8[:], i8[:], f8, f8)", cache=True
+                )(_best_move_loop)
+            except ImportError:
+                pass  # numba not installed - NumPy kernel handles large fleets
+            except Exception as e:
+                logger.warning("Failed to JIT-compile switch kernel, using NumPy: %s", e)
+    return _best_move_jit
+
+
+def _best_move_vectorized(
+    base: np.ndarray,
+    powers: np.ndarray,
+    src_idx: np.ndarray,
+    current_imbalance_kw: float,
+    threshold_kw: float,
+) -> Optional[Move]:
+    n = powers.shape[0]
+    rows = np.arange(n)
+    targets = np.arange(3)
+
+    # (n, 3) phase totals with each candidate removed from its source phase
+    removed = np.repeat(base[None, :], n, axis=0)
+    removed[rows, src_idx] -= powers
+
+    # (n, target, phase) totals with the candidate added to each target phase
+    trial = np.repeat(removed[:, None, :], 3, axis=1)
+    trial[:, targets, targets] += powers[:, None]
+
+    new_imbalance = trial.max(axis=2) - trial.min(axis=2)
+    improvement = current_imbalance_kw - new_imbalance
+
+    valid = (
+        (targets[None, :] != src_idx[:, None])
+        & (improvement > 0)
+        & (improvement >= threshold_kw)
+    )
+    if not valid.any():
+        return None
+
+    flat = int(np.argmax(np.where(valid, improvement, -np.inf)))
+    i, dst = divmod(flat, 3)
+    return (i, dst, float(improvement[i, dst]), float(new_imbalance[i, dst]))
+
+
+def best_move(
+    base: Sequence[float],
+    powers: Sequence[float],
+    src_idx: Sequence[int],
+    current_imbalance_kw: float,
+    threshold_kw: float,
+) -> Optional[Move]:
+    """Find the single-house move that most reduces the phase imbalance.
+
+    Args:
+        base: Current phase totals, ordered like PHASES.
+        powers: Signed power of each candidate house.
+        src_idx: Phase index each candidate currently sits on.
+        current_imbalance_kw: max(base) - min(base).
+        threshold_kw: Minimum improvement a move must reach.
+    """
+    if len(powers) < VECTORIZE_MIN_CANDIDATES:
+        return _best_move_scalar(base, powers, src_idx, current_imbalance_kw, threshold_kw)
+
+    base_arr = np.asarray(base, dtype=np.float64)
+    powers_arr = np.asarray(powers, dtype=np.float64)
+    src_arr = np.asarray(src_idx, dtype=np.int64)
+    jit = _jit_kernel()
+    if jit is None:
+        return _best_move_vectorized(
+            base_arr, powers_arr, src_arr, current_imbalance_kw, threshold_kw
+        )
+    move = jit(
+        base_arr, powers_arr, src_arr, float(current_imbalance_kw), float(threshold_kw)
+    )
+    return move if move[0] >= 0 else None
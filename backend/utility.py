@@ -10,12 +10,23 @@ Main responsibilities:
 - `PhaseRegistry` aggregates per-phase stats and detects mode/imbalances.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, NamedTuple, Tuple
 from pathlib import Path
 import json
+import math
+import sys
+import time
+try:
+    import orjson
+except ImportError:
+    orjson = None  # orjson not installed - stdlib json handles persistence
 from configerations import (
+    MODE_CONSUME,
+    MODE_EXPORT,
+    N_PHASES,
+    PHASE_IDX,
     PHASES,
     READING_EXPIRY_SECONDS,
     CURRENT_MODE_THRESHOLD,
@@ -34,13 +45,26 @@ from configerations import (
     RESET_SWITCH_HISTORY_ON_START,
 )
 
-@dataclass
+@dataclass(slots=True)
 class ReadingOfEachHouse:
     """Data from one house at a particular time."""
     timestamp: datetime
     voltage: float
     current : float
     power_kw: float
+    # Unix seconds of `timestamp`, computed once so expiry checks are a float subtraction
+    timestamp_epoch: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.timestamp_epoch = self.timestamp.timestamp()
+
+    def is_finite(self) -> bool:
+        """False for NaN/inf values, or nulls left in files by older writers."""
+        try:
+            return math.isfinite(self.voltage) and math.isfinite(self.current) and math.isfinite(self.power_kw)
+        except TypeError:
+            return False
+
     def to_dict(self) -> Dict:
         return {
             "timestamp": self.timestamp.isoformat(),
@@ -63,13 +87,18 @@ class ReadingOfEachHouse:
             power_kw=data["power_kw"],
         )
 
-@dataclass
+@dataclass(slots=True)
 class HouseState:
     """Current phase of the house."""
     house_id: str
     phase: str
     last_changed: datetime
     last_reading: Optional[ReadingOfEachHouse]
+    # Unix seconds of `last_changed`, so the switch cooldown is a float subtraction
+    last_changed_epoch: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.last_changed_epoch = self.last_changed.timestamp()
 
     def to_dict(self) -> Dict:
         return {
@@ -84,11 +113,13 @@ class HouseState:
         # Ensure UTC-aware datetime; if naive, assume UTC
         if lc.tzinfo is None:
             lc = lc.replace(tzinfo=timezone.utc)
+        reading = ReadingOfEachHouse.from_dict(data["last_reading"]) if data["last_reading"] else None
         return cls(
-            house_id=data["house_id"],
-            phase=data["phase"],
+            house_id=sys.intern(data["house_id"]),
+            phase=sys.intern(data["phase"]),
             last_changed=lc,
-            last_reading=ReadingOfEachHouse.from_dict(data["last_reading"]) if data["last_reading"] else None,
+            # A non-finite reading persisted before ingest rejected them is dropped
+            last_reading=reading if reading is not None and reading.is_finite() else None,
         )
     
 # Store data locally
@@ -99,16 +130,25 @@ class DataStorage:
         else:
             DATA_DIR.mkdir(parents=True, exist_ok=True)
     def _load_json(self, path: Path, default: Any) -> Any:
-        if not path.exists():
-            return default
+        # A missing file is empty; an unreadable one raises rather than reading
+        # back as empty, which the next save would write over the real data
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+            raw = path.read_bytes()
+        except FileNotFoundError:
             return default
+        if orjson is not None:
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                pass  # NaN/Infinity tokens from stdlib json.dump - json.loads accepts them
+        return json.loads(raw)
 
     def _write_json(self, path: Path, data: Any):
         path.parent.mkdir(parents=True, exist_ok=True)
+        if orjson is not None:
+            # Same 2-space layout as json.dump(indent=2), encoded in C straight to bytes
+            path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            return
         with open(path, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2)
     
@@ -139,12 +179,12 @@ class DataStorage:
         self._write_json(path, data)
 
     def clear_telemetry(self):
-        path = Path(TELEMETRY_DB)
-        self._write_json(path, [])
+        # A missing log reads back as empty history, so dropping the file is
+        # enough - no need to serialise an empty list on every startup.
+        Path(TELEMETRY_DB).unlink(missing_ok=True)
 
     def clear_switch_history(self):
-        path = Path(HISTORY_DB)
-        self._write_json(path, [])
+        Path(HISTORY_DB).unlink(missing_ok=True)
         
     def append_switch_history(self, switch_record: Dict):
         path = Path(HISTORY_DB)
@@ -171,6 +211,18 @@ class PhaseStats:
 
 
 @dataclass
+class PhaseSnapshot:
+    """Phase-level analysis for one balancing cycle, shared by every pass."""
+    phase_stats: List[PhaseStats]
+    phase_power: List[float]  # total_power_kw per phase, indexed like PHASES
+    imbalance_kw: float
+    detected_mode: str  # raw detect_mode() result, before run_cycle's stabilisation
+    conflicted_phases: List[str]
+    voltage_issues: Dict[str, List[str]]
+    power_issues: Dict[str, Any]
+
+
+@dataclass(slots=True, frozen=True)
 class RecommendedSwitch:
     """Recommendation to switch a house to a different phase."""
     house_id: str
@@ -179,11 +231,25 @@ class RecommendedSwitch:
     improved_kw: float
     new_imbalance_kw: float
     reason: str
+    is_conflict_resolution: bool = False  # Set by the balancer; bypasses the improvement checks
+
+class HouseSnapshot(NamedTuple):
+    """One house with an unexpired reading, as seen by the balancers."""
+    house_id: str
+    phase: str
+    power_kw: float
+    voltage: float
 
 # all houses and their current phase
 class HouseRegistry:
     def __init__(self, storage: DataStorage):
         self.storage = storage
+        # Bumped on every house/reading change; keys the snapshot() cache
+        self._version = 0
+        self._snapshot_key: Optional[Tuple[int, int]] = None
+        self._snapshot: Tuple[HouseSnapshot, ...] = ()
+        self._by_phase_source: Optional[Tuple[HouseSnapshot, ...]] = None
+        self._by_phase: Dict[str, List[HouseSnapshot]] = {}
         self.houses: Dict[str, HouseState] = (
             self.storage.load_houses() if self.storage else {}
         )
@@ -194,15 +260,53 @@ class HouseRegistry:
         elif self.storage and not (RESET_STATE_ON_START or RESET_HOUSES_ON_START):
             self._recover_latest_readings_from_telemetry()
 
+    def snapshot(self, now_epoch: Optional[float] = None) -> Tuple[HouseSnapshot, ...]:
+        """Houses with an unexpired reading, in registry order.
+
+        Cached per registry version and wall-clock second, so the passes made
+        within one balancing cycle share a single scan of the fleet. Only the
+        registry methods (add_house, update_reading, apply_switch, ...) bump
+        the version; writing to a HouseState directly leaves the cache stale.
+        """
+        if now_epoch is None:
+            now_epoch = time.time()
+        key = (self._version, int(now_epoch))
+        if key != self._snapshot_key:
+            live = []
+            for house in self.houses.values():
+                r = house.last_reading
+                if r is None:
+                    continue
+                if READING_EXPIRY_SECONDS > 0 and now_epoch - r.timestamp_epoch > READING_EXPIRY_SECONDS:
+                    continue
+                live.append(HouseSnapshot(house.house_id, house.phase, r.power_kw, r.voltage))
+            self._snapshot = tuple(live)
+            self._snapshot_key = key
+        return self._snapshot
+
+    def snapshot_by_phase(self, now_epoch: Optional[float] = None) -> Dict[str, List[HouseSnapshot]]:
+        """snapshot() grouped by phase (every phase in PHASES is present)."""
+        houses = self.snapshot(now_epoch)
+        if houses is not self._by_phase_source:
+            by_phase: Dict[str, List[HouseSnapshot]] = {p: [] for p in PHASES}
+            for house in houses:
+                by_phase[house.phase].append(house)
+            self._by_phase = by_phase
+            self._by_phase_source = houses
+        return self._by_phase
+
     def add_house(self, house_id: str, initial_phase: str):
         # initialize last_changed far in the past so newly-registered houses
         # are immediately eligible for switching unless explicitly set otherwise
+        # Interned so phase/id comparisons in the balancers are pointer checks
+        house_id = sys.intern(house_id)
         self.houses[house_id] = HouseState(
             house_id=house_id,
-            phase=initial_phase,
+            phase=sys.intern(initial_phase),
             last_changed=datetime(1970, 1, 1, tzinfo=timezone.utc),
             last_reading=None,
         )
+        self._version += 1
         if self.storage:
             # Persist the newly-registered house so it is available
             # after server restarts.
@@ -215,6 +319,7 @@ class HouseRegistry:
         """
         for house in self.houses.values():
             house.last_reading = None
+        self._version += 1
         if self.storage:
             self.storage.save_houses(self.houses)
             if RESET_TELEMETRY_ON_START:
@@ -226,6 +331,7 @@ class HouseRegistry:
     def _reset_houses_on_start(self):
         """Clear all house registrations and logs when configured to start fresh."""
         self.houses = {}
+        self._version += 1
         if not self.storage:
             return
         try:
@@ -253,6 +359,7 @@ class HouseRegistry:
         # Read telemetry.json as JSON array (not JSONL)
         latest_per_house = {}  # house_id -> (timestamp, reading)
         
+        now_epoch = time.time()
         try:
             telemetry_data = self.storage._load_json(telemetry_path, default=[])
             if not isinstance(telemetry_data, list):
@@ -269,9 +376,8 @@ class HouseRegistry:
                     if ts.tzinfo is None:
                         ts = ts.replace(tzinfo=timezone.utc)
                     
-                    now = datetime.now(timezone.utc)
                     if READING_EXPIRY_SECONDS > 0:
-                        if (now - ts).total_seconds() > READING_EXPIRY_SECONDS:
+                        if now_epoch - ts.timestamp() > READING_EXPIRY_SECONDS:
                             continue
                     
                     if house_id not in latest_per_house or ts > latest_per_house[house_id][0]:
@@ -281,6 +387,8 @@ class HouseRegistry:
                             current=entry.get("current", 0.0),
                             power_kw=entry.get("power_kw", 0.0)
                         )
+                        if not reading.is_finite():
+                            continue
                         latest_per_house[house_id] = (ts, reading)
                 except (KeyError, ValueError, TypeError) as e:
                     continue
@@ -291,19 +399,26 @@ class HouseRegistry:
         for house_id, (_, reading) in latest_per_house.items():
             if house_id in self.houses:
                 self.houses[house_id].last_reading = reading
+        self._version += 1
     
     def update_reading(self, house_id: str, voltage: float, current: float, power_kw: float):
         if house_id not in self.houses:
             raise ValueError(f"Unknown house: {house_id}")
         
+        # Coerce once at ingest so the balancers only ever see plain floats
+        # (ints and NumPy scalars would otherwise leak into the hot paths)
         reading = ReadingOfEachHouse(
             timestamp=datetime.now(timezone.utc),
-            voltage=voltage,
-            current=current,
-            power_kw=power_kw
+            voltage=float(voltage),
+            current=float(current),
+            power_kw=float(power_kw)
         )
+        # NaN/inf would poison the phase sums, and JSON has no portable spelling for them
+        if not reading.is_finite():
+            raise ValueError(f"Non-finite reading for house {house_id}")
         
         self.houses[house_id].last_reading = reading
+        self._version += 1
         
         if self.storage:
             self.storage.append_telemetry(house_id, reading, self.houses[house_id].phase)
@@ -313,15 +428,19 @@ class HouseRegistry:
         if house_id not in self.houses:
             raise ValueError("House not registered")
 
-        old_phase = self.houses[house_id].phase
-        self.houses[house_id].phase = new_phase
-        self.houses[house_id].last_changed = datetime.now(timezone.utc)
+        house = self.houses[house_id]
+        old_phase = house.phase
+        now = datetime.now(timezone.utc)
+        house.phase = sys.intern(new_phase)
+        house.last_changed = now
+        house.last_changed_epoch = now.timestamp()
+        self._version += 1
 
         if self.storage:
             self.storage.save_houses(self.houses)
 
             switch_record = {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": now.isoformat(),
                 "house_id": house_id,
                 "from_phase": old_phase,
                 "to_phase": new_phase,
@@ -336,16 +455,30 @@ class PhaseRegistry:
     def __init__(self, registry: HouseRegistry, storage: DataStorage):
         self.registry = registry
         self.storage = storage
+        # House snapshot the cached PhaseSnapshot was built from
+        self._snapshot_source: Optional[Tuple[HouseSnapshot, ...]] = None
+        self._snapshot: Optional[PhaseSnapshot] = None
 
-    def _effective_power_kw(self, house: HouseState, now: datetime) -> Optional[float]:
-        """Return house power from last reading, respecting reading expiry."""
-        reading = house.last_reading
-        if reading is None:
-            return None
-        if READING_EXPIRY_SECONDS > 0:
-            if (now - reading.timestamp).total_seconds() > READING_EXPIRY_SECONDS:
-                return None
-        return reading.power_kw
+    def snapshot(self) -> PhaseSnapshot:
+        """Stats, imbalance, mode, conflicts and issues for the current cycle.
+
+        Rebuilt only when the registry's house snapshot changes (a new
+        reading, a switch, or the next wall-clock second).
+        """
+        houses = self.registry.snapshot()
+        if houses is not self._snapshot_source or self._snapshot is None:
+            phase_stats = self._get_stats_from_houses()
+            self._snapshot = PhaseSnapshot(
+                phase_stats=phase_stats,
+                phase_power=[ps.total_power_kw for ps in phase_stats],
+                imbalance_kw=self.get_imbalance(phase_stats),
+                detected_mode=self.detect_mode(phase_stats),
+                conflicted_phases=self.detect_conflicted_phases(),
+                voltage_issues=self.detect_voltage_issues(phase_stats),
+                power_issues=self.detect_power_issues(phase_stats),
+            )
+            self._snapshot_source = houses
+        return self._snapshot
     
     def get_phase_stats(self) -> List[PhaseStats]:
         """Current stats for all phases using house summation (classic approach)."""
@@ -353,33 +486,25 @@ class PhaseRegistry:
     
     def _get_stats_from_houses(self) -> List[PhaseStats]:
         """Build phase stats by summing individual house readings (fallback)."""
-        stats = {p: {"power": 0.0, "voltages": [], "count": 0} for p in PHASES}
-        now = datetime.now(timezone.utc)
+        power = [0.0] * N_PHASES
+        voltage_sum = [0.0] * N_PHASES
+        count = [0] * N_PHASES
 
-        for house in self.registry.houses.values():
-            effective_power = self._effective_power_kw(house, now)
-            r = house.last_reading
-            if effective_power is None or r is None:
-                continue
-
-            phase = house.phase
-            stats[phase]["power"] += effective_power
-            stats[phase]["voltages"].append(r.voltage)
-            stats[phase]["count"] += 1
+        for house in self.registry.snapshot():
+            i = PHASE_IDX[house.phase]
+            power[i] += house.power_kw
+            voltage_sum[i] += house.voltage
+            count[i] += 1
 
         return [
             PhaseStats(
                 phase=p,
-                total_power_kw=stats[p]["power"],
-                house_count=stats[p]["count"],
-                avg_voltage=(
-                    sum(stats[p]["voltages"]) / len(stats[p]["voltages"])
-                    if stats[p]["voltages"]
-                    else 0.0
-                ),
+                total_power_kw=power[i],
+                house_count=count[i],
+                avg_voltage=voltage_sum[i] / count[i] if count[i] else 0.0,
                 source="house_summation"
             )
-            for p in PHASES
+            for i, p in enumerate(PHASES)
         ]
 
     def get_imbalance(self, phase_stat: List[PhaseStats]) -> float:
@@ -397,18 +522,11 @@ class PhaseRegistry:
                 'has_conflict': True if both exporters and importers exist
             }
         """
-        now = datetime.now(timezone.utc)
         export_power = 0.0
         import_power = 0.0
         
-        for house in self.registry.houses.values():
-            if house.phase != phase:
-                continue
-
-            effective_power = self._effective_power_kw(house, now)
-            if effective_power is None:
-                continue
-
+        for house in self.registry.snapshot_by_phase()[phase]:
+            effective_power = house.power_kw
             if effective_power < 0:
                 export_power += abs(effective_power)
             else:
@@ -468,23 +586,19 @@ class PhaseRegistry:
         return issues
 
     def detect_mode(self, phase_stat: List[PhaseStats]) -> str:
-        now = datetime.now(timezone.utc)
         export_power = 0.0
         import_power = 0.0
 
-        for house in self.registry.houses.values():
-            effective_power = self._effective_power_kw(house, now)
-            if effective_power is None:
-                continue
-
+        for house in self.registry.snapshot():
+            effective_power = house.power_kw
             if effective_power < 0:
                 export_power += abs(effective_power)
             else:
                 import_power += effective_power
 
         if export_power > CURRENT_MODE_THRESHOLD and export_power >= import_power:
-            return "EXPORT"
-        return "CONSUME"
+            return MODE_EXPORT
+        return MODE_CONSUME
     
     def detect_voltage_issues(self, phase_stat: List[PhaseStats]) -> Dict[str, List[str]]:
         issues = {
@@ -3,10 +3,10 @@ ML Module for Phase Balancing System
 
 This module provides machine learning capabilities for intelligent
 phase balancing decisions.
-"""
 
-from ml.ml_predictor import PhaseBalancingPredictor, get_predictor
-from ml.ml_integration import MLPhaseBalancer, get_ml_balancer
+The public names are resolved lazily (PEP 562), so importing a submodule
+such as ml.generate_datasets does not load the model stack.
+"""
 
 __all__ = [
     'PhaseBalancingPredictor',
@@ -14,3 +14,15 @@ __all__ = [
     'MLPhaseBalancer',
     'get_ml_balancer'
 ]
+
+
+def __getattr__(name):
+    if name in ('PhaseBalancingPredictor', 'get_predictor'):
+        from ml import ml_predictor as module
+    elif name in ('MLPhaseBalancer', 'get_ml_balancer'):
+        from ml import ml_integration as module
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(module, name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
@@ -1,96 +1,93 @@
 import csv
-import random
+
+import numpy as np
+
+# Training "switch" scenarios (low_high, medium_low_high, export_imbalance):
+# uniform bounds for the three phase values before they are shuffled
+_TRAIN_SWITCH_LO = np.array([[0.3, 3.5, 1.5], [0.5, 2.5, 4.0], [-3.5, -0.2, -2.0]])
+_TRAIN_SWITCH_HI = np.array([[2.0, 6.5, 3.5], [2.5, 4.0, 6.5], [-0.5, 1.5, 0.5]])
+
+
+def _round2(values):
+    """round(v, 2) per element: correctly rounded like the status reports, unlike np.round."""
+    return np.array([round(v, 2) for v in values.ravel().tolist()]).reshape(values.shape)
+
+
+def _around(rng, base, half_width):
+    """Each row is base plus independent uniform noise per phase, rounded to 2 dp."""
+    noise = rng.uniform(-1.0, 1.0, (len(base), 3)) * half_width
+    return _round2(base[:, None] + noise)
+
+
+def _spread(rng, lo, hi, n):
+    """Each row is three independent uniform draws, rounded and shuffled across phases."""
+    values = _round2(rng.uniform(lo, hi, (n, 3)))
+    return rng.permuted(values, axis=1)
+
 
 def generate_training_data(num_entries=10000):
     """Generate synthetic training data with L1, L2, L3 power values and switch labels."""
-    entries = []
-    
-    for i in range(num_entries):
-        if i % 2 == 0:  # Balanced scenarios (not_switch) - imbalance < 0.15 kW
-            base = random.uniform(0.3, 6.5)
-            l1 = round(base + random.uniform(-0.12, 0.12), 2)
-            l2 = round(base + random.uniform(-0.12, 0.12), 2)
-            l3 = round(base + random.uniform(-0.12, 0.12), 2)
-            switch = "not_switch"
-        else:  # Imbalanced scenarios (switch) - imbalance >= 0.15 kW
-            # Create significant imbalance
-            scenario = random.choice(['low_high', 'medium_low_high', 'export_imbalance'])
-            
-            if scenario == 'low_high':
-                # One phase very low, another very high
-                low = round(random.uniform(0.3, 2.0), 2)
-                high = round(random.uniform(3.5, 6.5), 2)
-                medium = round(random.uniform(1.5, 3.5), 2)
-                powers = [low, high, medium]
-            elif scenario == 'medium_low_high':
-                # Gradual imbalance
-                low = round(random.uniform(0.5, 2.5), 2)
-                medium = round(random.uniform(2.5, 4.0), 2)
-                high = round(random.uniform(4.0, 6.5), 2)
-                powers = [low, medium, high]
-            else:  # export_imbalance
-                # Export scenario with imbalance
-                low = round(random.uniform(-3.5, -0.5), 2)
-                high = round(random.uniform(-0.2, 1.5), 2)
-                medium = round(random.uniform(-2.0, 0.5), 2)
-                powers = [low, high, medium]
-            
-            random.shuffle(powers)
-            l1, l2, l3 = powers
-            switch = "switch"
-        
-        entries.append([l1, l2, l3, switch])
-    
+    rng = np.random.default_rng()
+    powers = np.empty((num_entries, 3))
+    
+    # Even rows: balanced scenarios (not_switch) - imbalance < 0.15 kW
+    n_balanced = (num_entries + 1) // 2
+    powers[0::2] = _around(rng, rng.uniform(0.3, 6.5, n_balanced), 0.12)
+    
+    # Odd rows: imbalanced scenarios (switch) - imbalance >= 0.15 kW
+    scenario = rng.integers(0, 3, num_entries - n_balanced)
+    powers[1::2] = _spread(rng, _TRAIN_SWITCH_LO[scenario], _TRAIN_SWITCH_HI[scenario], len(scenario))
+    
+    entries = powers.tolist()
+    for entry in entries[0::2]:
+        entry.append("not_switch")
+    for entry in entries[1::2]:
+        entry.append("switch")
     return entries
 
 def generate_test_data(num_entries=10000):
     """Generate synthetic test data with L1, L2, L3 power values (no labels)."""
-    entries = []
-    
-    for i in range(num_entries):
-        scenario = random.choice(['balanced', 'light_imbalance', 'moderate_imbalance', 
-                                 'critical_imbalance', 'export_balanced', 'export_imbalance'])
-        
-        if scenario == 'balanced':
-            base = random.uniform(0.5, 6.0)
-            l1 = round(base + random.uniform(-0.12, 0.12), 2)
-            l2 = round(base + random.uniform(-0.12, 0.12), 2)
-            l3 = round(base + random.uniform(-0.12, 0.12), 2)
-        elif scenario == 'light_imbalance':
-            base = random.uniform(1.5, 4.0)
-            l1 = round(base + random.uniform(-0.2, 0.2), 2)
-            l2 = round(base + random.uniform(-0.3, 0.3), 2)
-            l3 = round(base + random.uniform(-0.25, 0.25), 2)
-        elif scenario == 'moderate_imbalance':
-            low = round(random.uniform(1.0, 2.5), 2)
-            high = round(random.uniform(3.5, 5.5), 2)
-            medium = round(random.uniform(2.0, 3.5), 2)
-            powers = [low, high, medium]
-            random.shuffle(powers)
-            l1, l2, l3 = powers
-        elif scenario == 'critical_imbalance':
-            low = round(random.uniform(0.3, 1.5), 2)
-            high = round(random.uniform(4.5, 6.8), 2)
-            medium = round(random.uniform(1.5, 3.0), 2)
-            powers = [low, high, medium]
-            random.shuffle(powers)
-            l1, l2, l3 = powers
-        elif scenario == 'export_balanced':
-            base = round(random.uniform(-3.0, -0.5), 2)
-            l1 = round(base + random.uniform(-0.1, 0.1), 2)
-            l2 = round(base + random.uniform(-0.1, 0.1), 2)
-            l3 = round(base + random.uniform(-0.1, 0.1), 2)
-        else:  # export_imbalance
-            low = round(random.uniform(-4.0, -1.5), 2)
-            high = round(random.uniform(-0.5, 1.0), 2)
-            medium = round(random.uniform(-2.5, -0.5), 2)
-            powers = [low, high, medium]
-            random.shuffle(powers)
-            l1, l2, l3 = powers
-        
-        entries.append([l1, l2, l3])
-    
-    return entries
+    rng = np.random.default_rng()
+    powers = np.empty((num_entries, 3))
+    
+    # 0 balanced, 1 light_imbalance, 2 moderate_imbalance,
+    # 3 critical_imbalance, 4 export_balanced, 5 export_imbalance
+    scenario = rng.integers(0, 6, num_entries)
+    masks = [scenario == s for s in range(6)]
+    counts = [int(m.sum()) for m in masks]
+    
+    powers[masks[0]] = _around(rng, rng.uniform(0.5, 6.0, counts[0]), 0.12)
+    powers[masks[1]] = _around(rng, rng.uniform(1.5, 4.0, counts[1]), np.array([0.2, 0.3, 0.25]))
+    powers[masks[2]] = _spread(rng, [1.0, 3.5, 2.0], [2.5, 5.5, 3.5], counts[2])
+    powers[masks[3]] = _spread(rng, [0.3, 4.5, 1.5], [1.5, 6.8, 3.0], counts[3])
+    powers[masks[4]] = _around(rng, _round2(rng.uniform(-3.0, -0.5, counts[4])), 0.1)
+    powers[masks[5]] = _spread(rng, [-4.0, -0.5, -2.5], [-1.5, 1.0, -0.5], counts[5])
+    
+    return powers.tolist()
+
+def _append_rows(path, rows):
+    """Append rows to a CSV in one buffered write and return its total entry count.
+
+    Existing lines are counted in 1 MiB binary blocks before appending, so the
+    file is never read back line by line.
+    """
+    newlines = 0
+    last = b"\n"
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                newlines += block.count(b"\n")
+                last = block[-1:]
+    except FileNotFoundError:
+        pass
+    
+    with open(path, "a", newline="", buffering=1 << 20) as f:
+        if last != b"\n":
+            f.write("\n")  # Last row has no line break; don't glue the first new row onto it
+            newlines += 1
+        csv.writer(f, lineterminator="\n").writerows(rows)
+    
+    return newlines + len(rows) - 1  # Exclude header
 
 def main():
     print("Generating synthetic phase balancing datasets...")
@@ -99,9 +96,7 @@ def main():
     print("\nGenerating 10000 training entries...")
     training_data = generate_training_data(10000)
     
-    with open(r'c:\Users\DELL\Desktop\core_cutter\ml\phase_balancing_training_data.csv', 'a', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerows(training_data)
+    total_train = _append_rows(r'c:\Users\DELL\Desktop\core_cutter\ml\phase_balancing_training_data.csv', training_data)
     
     print(f"✓ Added {len(training_data)} entries to training data")
     
@@ -109,9 +104,7 @@ def main():
     print("\nGenerating 10000 test entries...")
     test_data = generate_test_data(10000)
     
-    with open(r'c:\Users\DELL\Desktop\core_cutter\ml\phase_balancing_test_data.csv', 'a', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerows(test_data)
+    total_test = _append_rows(r'c:\Users\DELL\Desktop\core_cutter\ml\phase_balancing_test_data.csv', test_data)
     
     print(f"✓ Added {len(test_data)} entries to test data")
     
@@ -131,12 +124,6 @@ def main():
     print(f"\nNew Test Data:")
     print(f"  Entries added: {len(test_data)}")
     
-    # Get total line counts
-    with open(r'c:\Users\DELL\Desktop\core_cutter\ml\phase_balancing_training_data.csv', 'r') as f:
-        total_train = len(f.readlines()) - 1  # Exclude header
-    with open(r'c:\Users\DELL\Desktop\core_cutter\ml\phase_balancing_test_data.csv', 'r') as f:
-        total_test = len(f.readlines()) - 1  # Exclude header
-    
     print(f"\nTotal Dataset Size:")
     print(f"  Training entries: {total_train}")
     print(f"  Test entries: {total_test}")
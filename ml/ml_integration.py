@@ -67,6 +67,31 @@ class MLPhaseBalancer:
             'phase_powers': {'L1': L1_kw, 'L2': L2_kw, 'L3': L3_kw}
         }
     
+    def should_balance_many(self, phase_stats_list: List[List[Dict]]) -> List[dict]:
+        """
+        Batch form of should_balance: one decision per phase_stats list,
+        with all ML predictions made in a single model call
+        """
+        if not self.enable_ml or self.predictor is None:
+            return [self._rule_based_decision(phase_stats) for phase_stats in phase_stats_list]
+        
+        rows = []
+        for phase_stats in phase_stats_list:
+            phase_powers = {ps['phase']: ps['total_power_kw'] for ps in phase_stats}
+            rows.append([phase_powers.get('L1', 0.0), phase_powers.get('L2', 0.0), phase_powers.get('L3', 0.0)])
+        
+        decisions = []
+        for (L1_kw, L2_kw, L3_kw), ml_result in zip(rows, self.predictor.predict_batch(rows)):
+            decisions.append({
+                'balance_needed': ml_result['should_switch'],
+                'reason': self._generate_reason(ml_result, L1_kw, L2_kw, L3_kw),
+                'imbalance_kw': ml_result['imbalance'],
+                'prediction_method': ml_result['method'],
+                'ml_confidence': ml_result.get('confidence'),
+                'phase_powers': {'L1': L1_kw, 'L2': L2_kw, 'L3': L3_kw}
+            })
+        return decisions
+    
     def _generate_reason(self, ml_result: dict, L1: float, L2: float, L3: float) -> str:
         """Generate human-readable reason for decision"""
         if ml_result['should_switch']:
@@ -90,8 +115,7 @@ class MLPhaseBalancer:
         L2_kw = phase_powers.get('L2', 0.0)
         L3_kw = phase_powers.get('L3', 0.0)
         
-        powers = [L1_kw, L2_kw, L3_kw]
-        imbalance = max(powers) - min(powers)
+        imbalance = max(L1_kw, L2_kw, L3_kw) - min(L1_kw, L2_kw, L3_kw)
         balance_needed = imbalance >= 0.15
         
         return {
@@ -1,35 +1,40 @@
 """
 ML Predictor - Load trained model and make predictions
 """
-import pickle
 import numpy as np
 from pathlib import Path
+from typing import List
+
+# Class codes written by train_and_save_model.py: 0 = not_switch, 1 = switch
+LABELS = ('not_switch', 'switch')
+
+# Where train_and_save_model.py saves the Booster, independent of the CWD
+MODEL_PATH = Path(__file__).parent / 'xgboost_model.ubj'
 
 class PhaseBalancingPredictor:
     """Predicts whether phase switching is needed based on L1, L2, L3 power values"""
     
-    def __init__(self, model_path='ml/xgboost_model.pkl', encoder_path='ml/label_encoder.pkl'):
+    def __init__(self, model_path=MODEL_PATH):
         """
-        Initialize predictor by loading trained model and label encoder
+        Initialize predictor by loading trained model
         
         Args:
-            model_path: Path to saved XGBoost model
-            encoder_path: Path to saved label encoder
+            model_path: Path to the saved XGBoost Booster (UBJSON binary format)
         """
         self.model_path = Path(model_path)
-        self.encoder_path = Path(encoder_path)
         self.model = None
-        self.label_encoder = None
         self.loaded = False
     
     def load_model(self):
-        """Load the trained model and label encoder"""
+        """Load the trained XGBoost Booster"""
         try:
-            with open(self.model_path, 'rb') as f:
-                self.model = pickle.load(f)
+            if not self.model_path.exists():
+                raise FileNotFoundError(self.model_path)
             
-            with open(self.encoder_path, 'rb') as f:
-                self.label_encoder = pickle.load(f)
+            import xgboost as xgb  # Only needed once a trained model exists
+            booster = xgb.Booster()
+            booster.load_model(str(self.model_path))
+            self.model = booster
             
             self.loaded = True
             print(f"[ML] Model loaded successfully from {self.model_path}")
@@ -65,33 +70,22 @@ class PhaseBalancingPredictor:
                 return self._rule_based_prediction(L1_kw, L2_kw, L3_kw)
         
         try:
-            # Verify model and encoder are loaded
-            if self.model is None or self.label_encoder is None:
+            # Verify model is loaded
+            if self.model is None:
                 return self._rule_based_prediction(L1_kw, L2_kw, L3_kw)
             
-            # Prepare input features
-            X = np.array([[L1_kw, L2_kw, L3_kw]])
-            
-            # Make prediction
-            prediction_encoded = self.model.predict(X)[0]
-            prediction_label = self.label_encoder.inverse_transform([prediction_encoded])[0]
-            
-            # Get confidence if model supports it
-            try:
-                if self.model is not None and hasattr(self.model, 'predict_proba'):
-                    probabilities = self.model.predict_proba(X)[0]
-                    confidence = float(max(probabilities))
-                else:
-                    confidence = None
-            except:
-                confidence = None
+            # One float32 tree walk gives P(switch); class and confidence follow from it
+            X = np.array([[L1_kw, L2_kw, L3_kw]], dtype=np.float32)
+            p_switch = float(self.model.inplace_predict(X)[0])
+            should_switch = p_switch > 0.5
+            prediction_label = LABELS[should_switch]
+            confidence = p_switch if should_switch else 1.0 - p_switch
             
             # Calculate imbalance
-            powers = [L1_kw, L2_kw, L3_kw]
-            imbalance = max(powers) - min(powers)
+            imbalance = max(L1_kw, L2_kw, L3_kw) - min(L1_kw, L2_kw, L3_kw)
             
             return {
-                'should_switch': prediction_label == 'switch',
+                'should_switch': should_switch,
                 'prediction': prediction_label,
                 'confidence': confidence,
                 'imbalance': round(imbalance, 3),
@@ -102,13 +96,52 @@ class PhaseBalancingPredictor:
             print(f"[ML] Prediction error: {e}, falling back to rule-based")
             return self._rule_based_prediction(L1_kw, L2_kw, L3_kw)
     
+    def predict_batch(self, X) -> List[dict]:
+        """
+        Predict for many [L1, L2, L3] rows with a single model call
+        
+        Args:
+            X: array-like of shape (N, 3) holding L1, L2, L3 power in kW
+            
+        Returns:
+            list of N dicts, each shaped like the result of predict()
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, 3)
+        
+        # Load model if not already loaded; fall back to rule-based without it
+        if not self.loaded:
+            self.load_model()
+        if self.model is None:
+            return self._rule_based_batch(X)
+        
+        try:
+            # One float32 tree walk over the whole batch gives P(switch) per row
+            p_switch = self.model.inplace_predict(np.ascontiguousarray(X, dtype=np.float32)).astype(np.float64)
+            switch = p_switch > 0.5
+            codes = switch.tolist()
+            confidences = np.where(switch, p_switch, 1.0 - p_switch).tolist()
+        except Exception as e:
+            print(f"[ML] Batch prediction error: {e}, falling back to rule-based")
+            return self._rule_based_batch(X)
+        
+        imbalances = (X.max(axis=1) - X.min(axis=1)).tolist()
+        return [
+            {
+                'should_switch': code,
+                'prediction': LABELS[code],
+                'confidence': confidence,
+                'imbalance': round(imbalance, 3),
+                'method': 'ml_model'
+            }
+            for code, confidence, imbalance in zip(codes, confidences, imbalances)
+        ]
+    
     def _rule_based_prediction(self, L1_kw: float, L2_kw: float, L3_kw: float) -> dict:
         """
         Fallback rule-based prediction if ML model is unavailable
         Uses simple threshold: imbalance >= 0.15 kW requires switch
         """
-        powers = [L1_kw, L2_kw, L3_kw]
-        imbalance = max(powers) - min(powers)
+        imbalance = max(L1_kw, L2_kw, L3_kw) - min(L1_kw, L2_kw, L3_kw)
         should_switch = imbalance >= 0.15
         
         return {
@@ -118,6 +151,20 @@ class PhaseBalancingPredictor:
             'imbalance': round(imbalance, 3),
             'method': 'rule_based_fallback'
         }
+    
+    def _rule_based_batch(self, X: np.ndarray) -> List[dict]:
+        """Rule-based fallback for an (N, 3) batch; imbalances computed in one pass"""
+        imbalances = (X.max(axis=1) - X.min(axis=1)).tolist()
+        return [
+            {
+                'should_switch': imbalance >= 0.15,
+                'prediction': 'switch' if imbalance >= 0.15 else 'not_switch',
+                'confidence': None,
+                'imbalance': round(imbalance, 3),
+                'method': 'rule_based_fallback'
+            }
+            for imbalance in imbalances
+        ]
 
 # Global predictor instance
 _predictor = None
@@ -3,46 +3,39 @@ Test script for phase switching predictions using trained ML model
 Loads the saved model and makes switch/not_switch decisions
 """
 
-import pickle
 import numpy as np
 import os
 
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_PATH = os.path.join(SCRIPT_DIR, 'phase_balancing_model.pkl')
-ENCODER_PATH = os.path.join(SCRIPT_DIR, 'label_encoder.pkl')
+MODEL_PATH = os.path.join(SCRIPT_DIR, 'xgboost_model.ubj')
+
+# Class codes written by train_and_save_model.py: 0 = not_switch, 1 = switch
+LABELS = ('not_switch', 'switch')
 
 
 def load_model():
-    """Load the trained model and label encoder"""
+    """Load the trained XGBoost Booster and the class labels it predicts"""
     if not os.path.exists(MODEL_PATH):
         raise FileNotFoundError(f"Model not found at {MODEL_PATH}. Train the model first!")
     
-    if not os.path.exists(ENCODER_PATH):
-        raise FileNotFoundError(f"Label encoder not found at {ENCODER_PATH}. Train the model first!")
-    
-    with open(MODEL_PATH, 'rb') as f:
-        model = pickle.load(f)
-    
-    with open(ENCODER_PATH, 'rb') as f:
-        encoder = pickle.load(f)
-    
-    return model, encoder
+    import xgboost as xgb  # Only needed once a trained model exists
+    model = xgb.Booster()
+    model.load_model(MODEL_PATH)
+    return model, LABELS
 
 
-def predict_switch(model, encoder, l1_kw, l2_kw, l3_kw):
+def predict_switches(model, labels, powers):
     """
-    Predict whether phase switching is needed
+    Predict whether phase switching is needed for many scenarios at once
     
     Args:
-        model: Trained XGBoost model
-        encoder: Label encoder
-        l1_kw: Power on L1 phase in kW
-        l2_kw: Power on L2 phase in kW
-        l3_kw: Power on L3 phase in kW
+        model: Trained XGBoost Booster
+        labels: Class labels indexed by class code
+        powers: Sequence of (l1_kw, l2_kw, l3_kw) tuples
     
     Returns:
-        dict: {
+        list of dicts, one per scenario: {
             'should_switch': bool,
             'prediction': str ('switch' or 'not_switch'),
             'confidence': float,
@@ -50,42 +43,50 @@ def predict_switch(model, encoder, l1_kw, l2_kw, l3_kw):
             'phase_powers': dict
         }
     """
-    # Prepare input
-    features = np.array([[l1_kw, l2_kw, l3_kw]])
-    
-    # Make prediction
-    prediction = model.predict(features)[0]
-    prediction_proba = model.predict_proba(features)[0]
-    prediction_label = encoder.inverse_transform([prediction])[0]
+    # Stack every scenario so the model is called once for the whole batch
+    X = np.asarray(powers, dtype=np.float64).reshape(-1, 3)
+    features = np.ascontiguousarray(X, dtype=np.float32)
     
-    # Get confidence (probability of predicted class)
-    confidence = prediction_proba[prediction]
+    # One float32 tree walk gives P(switch); the predicted class is the more
+    # probable one and its probability is the confidence
+    p_switch = model.inplace_predict(features).astype(np.float64)
+    predictions = (p_switch > 0.5).astype(np.int8)
+    confidences = np.where(predictions, p_switch, 1.0 - p_switch)
     
     # Calculate imbalance
-    imbalance = max(l1_kw, l2_kw, l3_kw) - min(l1_kw, l2_kw, l3_kw)
-    
-    return {
-        'should_switch': prediction_label == 'switch',
-        'prediction': prediction_label,
-        'confidence': float(confidence),
-        'imbalance': float(imbalance),
-        'phase_powers': {
-            'L1': l1_kw,
-            'L2': l2_kw,
-            'L3': l3_kw
-        }
-    }
+    imbalances = X.max(axis=1) - X.min(axis=1)
+    
+    results = []
+    for (l1_kw, l2_kw, l3_kw), prediction, confidence, imbalance in zip(
+        X.tolist(), predictions.tolist(), confidences.tolist(), imbalances.tolist()
+    ):
+        prediction_label = labels[prediction]
+        results.append({
+            'should_switch': prediction_label == 'switch',
+            'prediction': prediction_label,
+            'confidence': confidence,
+            'imbalance': imbalance,
+            'phase_powers': {
+                'L1': l1_kw,
+                'L2': l2_kw,
+                'L3': l3_kw
+            }
+        })
+    return results
+
 
+def predict_switch(model, labels, l1_kw, l2_kw, l3_kw):
+    """Predict whether phase switching is needed for a single scenario (see predict_switches)"""
+    return predict_switches(model, labels, [(l1_kw, l2_kw, l3_kw)])[0]
 
-def test_scenario(model, encoder, name, l1, l2, l3):
-    """Test a single scenario and display results"""
+
+def test_scenario(name, l1, l2, l3, result):
+    """Display the prediction for a single scenario"""
     print(f"\n{'='*70}")
     print(f"TEST: {name}")
     print(f"{'='*70}")
     print(f"Phase Powers: L1={l1:.2f} kW, L2={l2:.2f} kW, L3={l3:.2f} kW")
     
-    result = predict_switch(model, encoder, l1, l2, l3)
-    
     imbalance = result['imbalance']
     prediction = result['prediction']
     confidence = result['confidence']
@@ -115,7 +116,7 @@ def main():
     # Load model
     print("\n Loading trained model...")
     try:
-        model, encoder = load_model()
+        model, labels = load_model()
         print(" Model loaded successfully!")
     except FileNotFoundError as e:
         print(f"Error: {e}")
@@ -135,9 +136,12 @@ def main():
         ("One Phase Very High", 1.0, 6.5, 2.0),
     ]
     
+    # One batched prediction for every scenario, then display each result
+    predictions = predict_switches(model, labels, [(l1, l2, l3) for _, l1, l2, l3 in test_cases])
+    
     results = []
-    for name, l1, l2, l3 in test_cases:
-        result = test_scenario(model, encoder, name, l1, l2, l3)
+    for (name, l1, l2, l3), result in zip(test_cases, predictions):
+        test_scenario(name, l1, l2, l3, result)
         results.append((name, result))
     
     # Summary
@@ -3,40 +3,56 @@ Train XGBoost model and save it for production use
 """
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder
 import xgboost as xgb
-import pickle
+from pathlib import Path
+try:
+    import pyarrow.compute as pc
+    from pyarrow import csv as pacsv, float32
+except ImportError:
+    pacsv = None  # pyarrow not installed - pandas parses the CSV
+
+# Class codes read back by ml_predictor.LABELS: 0 = not_switch, 1 = switch
+LABELS = ('not_switch', 'switch')
+
+# Resolved against this directory, so the script runs from any CWD;
+# ml_predictor.MODEL_PATH reads the Booster back from the same place
+ML_DIR = Path(__file__).parent
+MODEL_PATH = ML_DIR / 'xgboost_model.ubj'
+
+def load_training_data(path=ML_DIR / 'phase_balancing_training_data.csv'):
+    """Read the training CSV into float32 features (L1, L2, L3) and int8 class codes"""
+    if pacsv is not None:
+        # Multithreaded C++ parser straight into float32 columns, no DataFrame
+        table = pacsv.read_csv(
+            str(path),
+            convert_options=pacsv.ConvertOptions(column_types={'L1': float32(), 'L2': float32(), 'L3': float32()}),
+        )
+        X = np.column_stack([table[col].to_numpy() for col in ('L1', 'L2', 'L3')])
+        y = pc.equal(table['switch'], 'switch').to_numpy().astype(np.int8)
+        return X, y
+
+    train_df = pd.read_csv(path, dtype={'L1': np.float32, 'L2': np.float32, 'L3': np.float32})
+    X = train_df[['L1', 'L2', 'L3']].to_numpy()
+    y = (train_df['switch'].to_numpy() == 'switch').astype(np.int8)
+    return X, y
 
 def train_and_save_model():
-    """Train model on training data and save it along with label encoder"""
-    # Load training data
-    train_df = pd.read_csv('phase_balancing_training_data.csv')
-    
-    # Prepare features and labels
-    X_train = train_df[['L1', 'L2', 'L3']].to_numpy()
-    y_train = train_df['switch'].to_numpy()
-    
-    # Encode labels
-    le = LabelEncoder()
-    y_train_encoded = le.fit_transform(y_train)
-    
+    """Train model on training data and save the underlying Booster"""
+    # Load features and labels (XGBoost works in float32 internally)
+    X_train, y_train = load_training_data()
+
     # Train XGBoost model
     model = xgb.XGBClassifier(n_estimators=100, random_state=42, eval_metric='logloss')
-    model.fit(X_train, y_train_encoded)
-    
-    # Save model
-    with open('xgboost_model.pkl', 'wb') as f:
-        pickle.dump(model, f)
-    
-    # Save label encoder
-    with open('label_encoder.pkl', 'wb') as f:
-        pickle.dump(le, f)
-    
+    model.fit(X_train, y_train)
+
+    # Save only the Booster, as UBJSON: XGBoost's binary format, smaller and
+    # faster to load than JSON (no pickle, no sklearn wrapper)
+    model.get_booster().save_model(str(MODEL_PATH))
+
     print("✅ Model trained and saved successfully!")
-    print(f"   - Model: xgboost_model.pkl")
-    print(f"   - Label Encoder: label_encoder.pkl")
+    print(f"   - Model: {MODEL_PATH}")
     print(f"   - Training samples: {len(X_train)}")
-    print(f"   - Classes: {le.classes_}")
+    print(f"   - Classes: {LABELS}")
 
 if __name__ == "__main__":
     train_and_save_model()
@@ -0,0 +1,130 @@
+"""
+Test file for HouseRegistry.snapshot and PhaseRegistry.snapshot
+Checks that the cached fleet and phase snapshots skip stale readings and
+are refreshed whenever a reading or phase changes
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path (backend modules import each other flat)
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from configerations import READING_EXPIRY_SECONDS
+from utility import HouseRegistry, PhaseRegistry
+
+
+def make_registry():
+    # No storage -> nothing is written to disk
+    registry = HouseRegistry(storage=None)
+    registry.add_house("H1", "L1")
+    registry.add_house("H2", "L2")
+    registry.add_house("H3", "L3")
+    return registry
+
+
+def test_snapshot_contents():
+    """Only houses with unexpired readings are included"""
+    print("=" * 70)
+    print("TEST 1: Snapshot contents")
+    print("=" * 70)
+
+    registry = make_registry()
+    registry.update_reading("H1", 230.0, 4.0, 0.9)
+    registry.update_reading("H2", 231.0, -2.0, -0.5)
+
+    now_epoch = time.time()
+    snap = registry.snapshot(now_epoch)
+    assert [h.house_id for h in snap] == ["H1", "H2"], f"Unexpected houses {snap}"
+    assert snap[0].phase == "L1" and snap[0].power_kw == 0.9 and snap[0].voltage == 230.0
+    print("✓ H3 without a reading skipped, H1/H2 fields copied")
+
+    expired = registry.snapshot(now_epoch + READING_EXPIRY_SECONDS + 60)
+    assert expired == (), f"Expired readings not skipped {expired}"
+    print("✓ Readings older than READING_EXPIRY_SECONDS skipped")
+
+    print("\n✅ Snapshot content tests passed!\n")
+
+
+def test_snapshot_invalidation():
+    """Cache is reused within a cycle and rebuilt after registry changes"""
+    print("=" * 70)
+    print("TEST 2: Snapshot cache invalidation")
+    print("=" * 70)
+
+    registry = make_registry()
+    registry.update_reading("H1", 230.0, 4.0, 0.9)
+
+    now_epoch = time.time()
+    first = registry.snapshot(now_epoch)
+    assert registry.snapshot(now_epoch) is first
+    print("✓ Same second, no changes -> cached snapshot reused")
+
+    registry.update_reading("H2", 231.0, 2.0, 0.4)
+    assert [h.house_id for h in registry.snapshot(now_epoch)] == ["H1", "H2"]
+    print("✓ New reading -> snapshot rebuilt")
+
+    registry.apply_switch("H1", "L3")
+    assert registry.snapshot(now_epoch)[0].phase == "L3"
+    print("✓ Phase switch -> snapshot rebuilt")
+
+    by_phase = registry.snapshot_by_phase(now_epoch)
+    assert [h.house_id for h in by_phase["L3"]] == ["H1"] and by_phase["L1"] == []
+    print("✓ Per-phase grouping follows the switch")
+
+    print("\n✅ Snapshot invalidation tests passed!\n")
+
+
+def test_phase_snapshot():
+    """PhaseSnapshot follows the house snapshot it was built from"""
+    print("=" * 70)
+    print("TEST 3: Phase snapshot")
+    print("=" * 70)
+
+    registry = make_registry()
+    analyzer = PhaseRegistry(registry, storage=None)
+    registry.update_reading("H1", 230.0, 8.0, 1.8)
+    registry.update_reading("H2", 230.0, 1.0, 0.2)
+
+    snap = analyzer.snapshot()
+    assert abs(snap.imbalance_kw - 1.8) < 1e-9, f"Unexpected imbalance {snap.imbalance_kw}"
+    assert [ps.total_power_kw for ps in snap.phase_stats] == [1.8, 0.2, 0.0]
+    assert analyzer.snapshot() is snap
+    print("✓ Stats and imbalance computed once and reused")
+
+    registry.update_reading("H3", 230.0, 4.0, 0.9)
+    snap = analyzer.snapshot()
+    assert [ps.total_power_kw for ps in snap.phase_stats] == [1.8, 0.2, 0.9]
+    print("✓ New reading -> phase snapshot rebuilt")
+
+    print("\n✅ Phase snapshot tests passed!\n")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Snapshot Contents", test_snapshot_contents),
+        ("Snapshot Invalidation", test_snapshot_invalidation),
+        ("Phase Snapshot", test_phase_snapshot),
+    ]
+
+    failed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            print(f"\n❌ TEST FAILED: {test_name}")
+            print(f"   Error: {e}\n")
+            failed += 1
+
+    print("=" * 70)
+    if failed == 0:
+        print("🎉 ALL TESTS PASSED! House snapshot is working correctly.")
+    else:
+        print(f"⚠️  {failed} test(s) failed. Please review the errors above.")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
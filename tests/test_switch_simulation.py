@@ -0,0 +1,137 @@
+"""
+Test file for the switch simulation kernels
+Checks that the scalar, NumPy and (if installed) Numba kernels pick the
+same move as a straightforward dict-based simulation
+"""
+
+import sys
+import random
+from pathlib import Path
+
+# Add backend directory to path (backend modules import each other flat)
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from configerations import PHASES
+from simulation import _best_move_scalar, _best_move_vectorized, _jit_kernel, best_move
+import numpy as np
+
+
+def reference_best_move(base, powers, src_idx, current_imbalance_kw, threshold_kw):
+    """Original dict-copy simulation, kept here as the behavioural reference."""
+    baseline = {p: base[i] for i, p in enumerate(PHASES)}
+    best = None
+    best_improvement = 0.0
+    for i, (power, src) in enumerate(zip(powers, src_idx)):
+        for dst, to_phase in enumerate(PHASES):
+            if dst == src:
+                continue
+            new_net = baseline.copy()
+            new_net[PHASES[src]] -= power
+            new_net[to_phase] += power
+            new_imbalance = max(new_net.values()) - min(new_net.values())
+            improvement = current_imbalance_kw - new_imbalance
+            if improvement <= 0 or improvement < threshold_kw:
+                continue
+            if improvement > best_improvement:
+                best_improvement = improvement
+                best = (i, dst, improvement, new_imbalance)
+    return best
+
+
+def random_case(rng, n):
+    powers = [round(rng.uniform(-1.5, 1.5), 2) for _ in range(n)]
+    src_idx = [rng.randrange(3) for _ in range(n)]
+    base = [0.0, 0.0, 0.0]
+    for p, s in zip(powers, src_idx):
+        base[s] += p
+    current = max(base) - min(base)
+    threshold = rng.choice([0.0, 0.05, 0.2])
+    return base, powers, src_idx, current, threshold
+
+
+def test_kernels_match_reference():
+    """Scalar and vectorized kernels agree with the dict simulation"""
+    print("=" * 70)
+    print("TEST 1: Kernels match reference simulation")
+    print("=" * 70)
+
+    jit_kernel = _jit_kernel()
+    rng = random.Random(42)
+    for case in range(500):
+        n = rng.choice([1, 2, 5, 19, 20, 60])
+        base, powers, src_idx, current, threshold = random_case(rng, n)
+        expected = reference_best_move(base, powers, src_idx, current, threshold)
+
+        scalar = _best_move_scalar(base, powers, src_idx, current, threshold)
+        vector = _best_move_vectorized(
+            np.asarray(base), np.asarray(powers), np.asarray(src_idx, dtype=np.intp),
+            current, threshold,
+        )
+        assert scalar == expected, f"Case {case}: scalar {scalar} != reference {expected}"
+        assert vector == expected, f"Case {case}: vectorized {vector} != reference {expected}"
+        if jit_kernel is not None:
+            jit = jit_kernel(
+                np.asarray(base), np.asarray(powers), np.asarray(src_idx, dtype=np.int64),
+                current, threshold,
+            )
+            assert (jit if jit[0] >= 0 else None) == expected, f"Case {case}: JIT {jit} != reference {expected}"
+        assert best_move(base, powers, src_idx, current, threshold) == expected
+
+    print("✓ 500 random fleets give identical moves")
+    if jit_kernel is None:
+        print("  (numba not installed - JIT kernel not checked)")
+    print("\n✅ Kernel equivalence tests passed!\n")
+
+
+def test_edge_cases():
+    """Empty candidate lists and unreachable thresholds"""
+    print("=" * 70)
+    print("TEST 2: Edge Cases")
+    print("=" * 70)
+
+    assert best_move([0.0, 0.0, 0.0], [], [], 0.0, 0.05) is None
+    print("✓ No candidates -> no move")
+
+    # L1 overloaded by a single 1kW house: moving it anywhere cannot help
+    assert best_move([1.0, 0.0, 0.0], [1.0], [0], 1.0, 0.05) is None
+    print("✓ Moving the only load does not count as an improvement")
+
+    # Two 1kW houses on L1 -> move one of them to L2
+    move = best_move([2.0, 0.0, 0.0], [1.0, 1.0], [0, 0], 2.0, 0.05)
+    assert move == (0, 1, 1.0, 1.0), f"Unexpected move {move}"
+    print("✓ Ties resolve to the first candidate and first target phase")
+
+    # Source is not the highest phase, but the target is the lowest: still a win
+    move = best_move([10.0, 5.0, 0.0], [2.0], [1], 10.0, 0.05)
+    assert move == (0, 2, 2.0, 8.0), f"Unexpected move {move}"
+    print("✓ Pruning keeps moves that only touch the lowest phase")
+
+    print("\n✅ All edge case tests passed!\n")
+
+
+def main():
+    """Run all tests"""
+    tests = [
+        ("Kernel Equivalence", test_kernels_match_reference),
+        ("Edge Cases", test_edge_cases),
+    ]
+
+    failed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            print(f"\n❌ TEST FAILED: {test_name}")
+            print(f"   Error: {e}\n")
+            failed += 1
+
+    print("=" * 70)
+    if failed == 0:
+        print("🎉 ALL TESTS PASSED! Switch simulation is working correctly.")
+    else:
+        print(f"⚠️  {failed} test(s) failed. Please review the errors above.")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()